@@ -0,0 +1,519 @@
+import os
+import csv
+import json
+import math
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from price_analyzer import PriceAnalyzer
+from news_analyzer import NewsAnalyzer
+
+
+# News is bucketed by the minute it was published in, rounded up, so a bucket
+# never holds an article published after the bucket's timestamp
+NEWS_BUCKET_MS = 60_000
+
+OUTPUT_FIELDS = [
+    "coin", "window_start", "window_end", "current_price", "price_change_percent",
+    "volatility", "positive_articles", "negative_articles", "sentiment",
+    "momentum_signal", "sentiment_signal", "forward_return_percent",
+]
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Parses epoch seconds/milliseconds or ISO-8601 strings into a UTC datetime."""
+
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        text = str(value).strip().replace("Z", "+00:00")
+        parsed = datetime.fromisoformat(text)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    # CoinGecko dumps use milliseconds
+    if number > 1e11:
+        number /= 1000
+    return datetime.fromtimestamp(number, tz=timezone.utc)
+
+
+def _row_coin(raw: Any, coin: Optional[str]) -> Optional[str]:
+    """Normalizes a row's coin. Rows without one belong to the --coin filter (or "unknown")."""
+
+    if raw is None or raw == "":
+        return (coin or "unknown").lower()
+    if not isinstance(raw, str):
+        return None
+    return raw.lower()
+
+
+def _iter_line_chunks(f, chunk_size: int) -> Iterator[List[str]]:
+    """Yields raw lines in chunks so workers, not the parent, do the parsing."""
+
+    chunk = []
+    for line in f:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _iter_price_tasks(path: str, chunk_size: int) -> Iterator[Tuple[str, Any, Any]]:
+    """Splits a price dump into worker tasks: raw CSV line chunks or chunk_size slices of Parquet row groups."""
+
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow")
+
+        # Row groups can hold a million rows or more, so they are split to keep
+        # worker memory bounded by chunk_size rather than by how the file was written
+        metadata = pq.ParquetFile(path).metadata
+        for row_group in range(metadata.num_row_groups):
+            for offset in range(0, metadata.row_group(row_group).num_rows, chunk_size):
+                yield "parquet", path, (row_group, offset, chunk_size)
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader([f.readline()]), [])
+        for lines in _iter_line_chunks(f, chunk_size):
+            yield "csv", lines, header
+
+
+def _read_price_task(task: Tuple[str, Any, Any]) -> Iterator[Dict[str, Any]]:
+    """Worker: turns a task back into row dicts."""
+
+    kind, source, extra = task
+
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+
+        row_group, offset, size = extra
+        parquet_file = pq.ParquetFile(source)
+        columns = [c for c in ("coin", "timestamp", "price") if c in parquet_file.schema_arrow.names]
+
+        # Stream the row group and only materialize rows in [offset, offset + size)
+        position = 0
+        for batch in parquet_file.iter_batches(batch_size=size, row_groups=[row_group], columns=columns):
+            start = max(offset - position, 0)
+            end = min(offset + size - position, batch.num_rows)
+            if start < end:
+                yield from batch.slice(start, end - start).to_pylist()
+            position += batch.num_rows
+            if position >= offset + size:
+                return
+        return
+
+    for values in csv.reader(source):
+        if values:
+            yield dict(zip(extra, values))
+
+
+def _score_window(analyzer: PriceAnalyzer, coin: str, points: List[List[float]], forward_price: float) -> Dict[str, Any]:
+    """Runs PriceAnalyzer metrics over one window and adds the forward return."""
+
+    metrics = analyzer.process_price_data({"prices": points}, coin)
+    end_price = points[-1][1]
+    metrics["window_start"] = points[0][0]
+    metrics["window_end"] = points[-1][0]
+    metrics["forward_return_percent"] = round((forward_price - end_price) / end_price * 100, 4)
+    return metrics
+
+
+def _process_price_chunk(task: Tuple[str, Any, Any], window: int, horizon: int, coin: Optional[str]) -> Dict[str, Any]:
+    """Worker: parses a chunk of price rows and scores every window that lies fully inside it.
+
+    Returns per-coin point counts, the first and last window+horizon-1 points
+    (so the parent can score windows that straddle chunk boundaries) and the
+    scored windows keyed by the local index of their forward point.
+    """
+
+    span = window + horizon
+    series: Dict[str, List[List[float]]] = defaultdict(list)
+    skipped = 0
+
+    for row in _read_price_task(task):
+        row_coin = _row_coin(row.get("coin"), coin)
+        if row_coin is None:
+            skipped += 1
+            continue
+        if coin and row_coin != coin.lower():
+            continue
+
+        try:
+            timestamp = _parse_timestamp(row["timestamp"]).timestamp() * 1000
+            price = float(row["price"])
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            skipped += 1
+            continue
+
+        if not math.isfinite(price) or price <= 0:
+            skipped += 1
+            continue
+
+        points = series[row_coin]
+        if points and timestamp < points[-1][0]:
+            raise ValueError(f"Price rows for {row_coin} are not in time order "
+                             f"({datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).isoformat()})")
+        points.append([timestamp, price])
+
+    analyzer = PriceAnalyzer()
+    coins = {}
+    for row_coin, points in series.items():
+        windows = []
+        for end in range(span - 1, len(points)):
+            start = end - span + 1
+            windows.append((end, _score_window(analyzer, row_coin, points[start:start + window], points[end][1])))
+
+        coins[row_coin] = {
+            "count": len(points),
+            "head": points[:span - 1],
+            "tail": points[-(span - 1):],
+            "windows": windows,
+        }
+
+    return {"coins": coins, "skipped": skipped}
+
+
+def _score_news_chunk(lines: List[str], coin: Optional[str]) -> Tuple[Dict[Tuple[str, int], List[int]], int]:
+    """Worker: counts [positive, negative, neutral] articles per (coin, minute bucket)."""
+
+    analyzer = NewsAnalyzer()
+    labels = {"positive": 0, "negative": 1, "neutral": 2}
+    buckets: Dict[Tuple[str, int], List[int]] = {}
+    skipped = 0
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            article = json.loads(line)
+            article_coin = _row_coin(article.get("coin"), coin)
+            published = article.get("published_date") or article.get("publishedDate") or article.get("timestamp")
+            published_ms = int(_parse_timestamp(published).timestamp() * 1000)
+        except (AttributeError, TypeError, ValueError, OverflowError, OSError):
+            skipped += 1
+            continue
+
+        if article_coin is None:
+            skipped += 1
+            continue
+        if coin and article_coin != coin.lower():
+            continue
+
+        text = article.get("text")
+        label = analyzer.analyze_sentiment_individual(text if isinstance(text, str) else "")
+        bucket = -(-published_ms // NEWS_BUCKET_MS)
+        buckets.setdefault((article_coin, bucket), [0, 0, 0])[labels[label]] += 1
+
+    return buckets, skipped
+
+
+class BacktestRunner:
+    """Replays bulk historical data through the price metrics and sentiment code."""
+
+    def __init__(self,
+                 window: int = 7,
+                 step: int = 1,
+                 horizon: int = 1,
+                 chunk_size: int = 50_000,
+                 workers: int = None,
+                 max_pending: int = None):
+        for name, value in (("window", window), ("step", step), ("horizon", horizon), ("chunk_size", chunk_size)):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1, got {value}")
+
+        self.window = window
+        self.step = step
+        self.horizon = horizon
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        # Caps how many chunks are queued at once, which bounds memory use
+        self.max_pending = max_pending or self.workers * 2
+
+        # coin -> (sorted buckets, cumulative positive, negative and total counts)
+        self.sentiment_index: Dict[str, Tuple[array, array, array, array]] = {}
+
+    def run(self,
+            price_path: str,
+            output_path: str,
+            news_path: str = None,
+            coin: str = None) -> Dict[str, Any]:
+        """Runs the backtest, writes per-window signals to output_path and returns evaluation stats."""
+
+        stats = {
+            "windows": 0,
+            "skipped_rows": 0,
+            "skipped_articles": 0,
+            "momentum": defaultdict(float),
+            "sentiment": defaultdict(float),
+        }
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            if news_path:
+                stats["skipped_articles"] = self._load_news(pool, news_path, coin)
+
+            with open(output_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+                writer.writeheader()
+
+                for metrics in self._iter_windows(pool, price_path, coin, stats):
+                    self._write_result(metrics, writer, stats)
+
+        return self._summarize(stats)
+
+    def _load_news(self, pool: ProcessPoolExecutor, news_path: str, coin: Optional[str]) -> int:
+        """Classifies the news archive into per-coin sentiment counts. Returns the skipped line count."""
+
+        pending = deque()
+        skipped = 0
+        counts: Dict[Tuple[str, int], List[int]] = {}
+
+        def merge(result: Tuple[Dict[Tuple[str, int], List[int]], int]):
+            nonlocal skipped
+            buckets, chunk_skipped = result
+            skipped += chunk_skipped
+            for key, bucket_counts in buckets.items():
+                totals = counts.setdefault(key, [0, 0, 0])
+                for i, count in enumerate(bucket_counts):
+                    totals[i] += count
+
+        with open(news_path, encoding="utf-8") as f:
+            for lines in _iter_line_chunks(f, self.chunk_size):
+                if len(pending) >= self.max_pending:
+                    merge(pending.popleft().result())
+                pending.append(pool.submit(_score_news_chunk, lines, coin))
+
+        while pending:
+            merge(pending.popleft().result())
+
+        self._build_sentiment_index(counts)
+        return skipped
+
+    def _build_sentiment_index(self, counts: Dict[Tuple[str, int], List[int]]):
+        """Turns bucket counts into per-coin prefix sums so each window is two bisects."""
+
+        by_coin: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        for (coin, bucket), bucket_counts in counts.items():
+            by_coin[coin].append((bucket, bucket_counts))
+
+        for coin, entries in by_coin.items():
+            entries.sort()
+            buckets = array("q")
+            positive, negative, total = array("q", [0]), array("q", [0]), array("q", [0])
+            for bucket, (pos, neg, neu) in entries:
+                buckets.append(bucket)
+                positive.append(positive[-1] + pos)
+                negative.append(negative[-1] + neg)
+                total.append(total[-1] + pos + neg + neu)
+            self.sentiment_index[coin] = (buckets, positive, negative, total)
+
+    def _iter_windows(self,
+                      pool: ProcessPoolExecutor,
+                      price_path: str,
+                      coin: Optional[str],
+                      stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Fans price chunks out to the workers and yields scored windows in input order."""
+
+        pending = deque()
+        offsets: Dict[str, int] = {}
+        tails: Dict[str, List[List[float]]] = {}
+        analyzer = PriceAnalyzer()
+
+        for task in _iter_price_tasks(price_path, self.chunk_size):
+            if len(pending) >= self.max_pending:
+                yield from self._stitch(pending.popleft().result(), offsets, tails, analyzer, stats)
+            pending.append(pool.submit(_process_price_chunk, task, self.window, self.horizon, coin))
+
+        while pending:
+            yield from self._stitch(pending.popleft().result(), offsets, tails, analyzer, stats)
+
+    def _stitch(self,
+                chunk: Dict[str, Any],
+                offsets: Dict[str, int],
+                tails: Dict[str, List[List[float]]],
+                analyzer: PriceAnalyzer,
+                stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Scores windows that straddle the previous chunk, then applies the step to every window."""
+
+        span = self.window + self.horizon
+        stats["skipped_rows"] += chunk["skipped"]
+
+        for row_coin, part in chunk["coins"].items():
+            tail = tails.get(row_coin, [])
+            head = part["head"]
+            offset = offsets.get(row_coin, 0)
+
+            if tail and head and head[0][0] < tail[-1][0]:
+                raise ValueError(f"Price rows for {row_coin} are not in time order "
+                                 f"({datetime.fromtimestamp(head[0][0] / 1000, tz=timezone.utc).isoformat()})")
+
+            # Windows whose forward point is among this chunk's first span-1 points
+            combined = tail + head
+            for end in range(max(len(tail), span - 1), len(combined)):
+                if self._on_step(offset + end - len(tail)):
+                    start = end - span + 1
+                    yield _score_window(analyzer, row_coin, combined[start:start + self.window], combined[end][1])
+
+            for end, metrics in part["windows"]:
+                if self._on_step(offset + end):
+                    yield metrics
+
+            offsets[row_coin] = offset + part["count"]
+            tails[row_coin] = part["tail"] if part["count"] >= span - 1 else combined[-(span - 1):]
+
+    def _on_step(self, index: int) -> bool:
+        """True if the window whose forward point is the coin's index-th point should be emitted."""
+
+        return (index - (self.window + self.horizon - 1)) % self.step == 0
+
+    def _window_sentiment(self, coin: str, start_ms: float, end_ms: float) -> Tuple[int, int, str]:
+        """Totals the coin's articles published within the window.
+
+        Only articles published at or before the window's last price point are
+        counted; anything later falls in the forward-return period and would
+        leak the outcome into the signal.
+        """
+
+        if coin not in self.sentiment_index:
+            return 0, 0, ""
+
+        buckets, positive, negative, total = self.sentiment_index[coin]
+        # Bucket b holds articles published in ((b - 1) * NEWS_BUCKET_MS, b * NEWS_BUCKET_MS], so
+        # the end bound is exact and the start bound may reach up to a minute earlier
+        lo = bisect_left(buckets, -(-int(start_ms) // NEWS_BUCKET_MS))
+        hi = bisect_right(buckets, int(end_ms) // NEWS_BUCKET_MS)
+
+        # No news for this coin in the window means no sentiment signal
+        if hi <= lo or total[hi] == total[lo]:
+            return 0, 0, ""
+
+        pos = positive[hi] - positive[lo]
+        neg = negative[hi] - negative[lo]
+
+        if pos > neg:
+            return pos, neg, "positive"
+        elif neg > pos:
+            return pos, neg, "negative"
+        else:
+            return pos, neg, "neutral"
+
+    def _write_result(self, metrics: Dict[str, Any], writer: csv.DictWriter, stats: Dict[str, Any]):
+        """Attaches signals to a scored window, writes it and updates running stats."""
+
+        if "error" in metrics:
+            return
+
+        coin = metrics["cryptocurrency"]
+        positive, negative, sentiment = self._window_sentiment(coin, metrics["window_start"], metrics["window_end"])
+        momentum_signal = self._signal(metrics["price_change_percent"])
+        sentiment_signal = {"positive": "bullish", "negative": "bearish", "neutral": "neutral"}.get(sentiment, "")
+        forward_return = metrics["forward_return_percent"]
+
+        writer.writerow({
+            "coin": coin,
+            "window_start": datetime.fromtimestamp(metrics["window_start"] / 1000, tz=timezone.utc).isoformat(),
+            "window_end": datetime.fromtimestamp(metrics["window_end"] / 1000, tz=timezone.utc).isoformat(),
+            "current_price": metrics["current_price"],
+            "price_change_percent": metrics["price_change_percent"],
+            "volatility": metrics["volatility"],
+            "positive_articles": positive,
+            "negative_articles": negative,
+            "sentiment": sentiment,
+            "momentum_signal": momentum_signal,
+            "sentiment_signal": sentiment_signal,
+            "forward_return_percent": forward_return,
+        })
+
+        stats["windows"] += 1
+        self._record_signal(stats["momentum"], momentum_signal, forward_return)
+        self._record_signal(stats["sentiment"], sentiment_signal, forward_return)
+
+    def _signal(self, change_percent: float) -> str:
+        """Maps a price change to a directional signal."""
+
+        if change_percent > 0:
+            return "bullish"
+        elif change_percent < 0:
+            return "bearish"
+        return "neutral"
+
+    def _record_signal(self, signal_stats: Dict[str, Any], signal: str, forward_return: float):
+        """Counts a directional signal as a hit if the forward return moved the same way."""
+
+        if signal not in ("bullish", "bearish"):
+            return
+
+        signal_stats["signals"] += 1
+        if signal == self._signal(forward_return):
+            signal_stats["hits"] += 1
+
+        # Running sums keep memory flat no matter how many windows there are
+        signal_stats[f"{signal}_return_total"] += forward_return
+        signal_stats[f"{signal}_count"] += 1
+
+    def _summarize(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Turns running totals into hit rates and average forward returns."""
+
+        summary = {
+            "windows": stats["windows"],
+            "skipped_rows": stats["skipped_rows"],
+            "skipped_articles": stats["skipped_articles"],
+        }
+
+        for name in ("momentum", "sentiment"):
+            signal_stats = stats[name]
+            signals = int(signal_stats["signals"])
+            summary[name] = {
+                "signals": signals,
+                "hit_rate": round(signal_stats["hits"] / signals * 100, 2) if signals else None,
+            }
+            for direction in ("bullish", "bearish"):
+                count = signal_stats[f"{direction}_count"]
+                total = signal_stats[f"{direction}_return_total"]
+                summary[name][f"avg_forward_return_{direction}"] = round(total / count, 4) if count else None
+
+        return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest price metrics and news sentiment over historical data files.")
+    parser.add_argument("prices", help="CSV or Parquet file with timestamp, price and optional coin columns, in time order per coin")
+    parser.add_argument("--news", help="JSONL news archive with published_date, text and optional coin fields")
+    parser.add_argument("--coin", help="Only backtest this coin")
+    parser.add_argument("--window", type=int, default=7, help="Price points per window (default: 7)")
+    parser.add_argument("--step", type=int, default=1, help="Points between window starts (default: 1)")
+    parser.add_argument("--horizon", type=int, default=1, help="Points ahead used for the forward return (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per worker task; Parquet row groups are split to this size (default: 50000)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", default="backtest_results.csv", help="Per-window signals output file")
+    args = parser.parse_args()
+
+    try:
+        runner = BacktestRunner(window=args.window, step=args.step, horizon=args.horizon,
+                                chunk_size=args.chunk_size, workers=args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"📊 Backtesting {args.prices}...")
+    summary = runner.run(args.prices, args.output, news_path=args.news, coin=args.coin)
+
+    print(f"   ✓ Scored {summary['windows']} windows, signals written to {args.output}")
+    if summary["skipped_rows"] or summary["skipped_articles"]:
+        print(f"   ⚠️  Skipped {summary['skipped_rows']} bad price rows and {summary['skipped_articles']} bad news lines")
+    print()
+    for name in ("momentum", "sentiment"):
+        print(f"{name.title()} signals: {summary[name]}")
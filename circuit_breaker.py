@@ -0,0 +1,112 @@
+import time
+import threading
+from typing import Optional
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """True for HTTP statuses that mean the upstream itself is struggling (5xx, 429).
+
+    Other errors such as a 404 for an unknown coin are the caller's fault and
+    must not count against the upstream's circuit breaker.
+    """
+
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    """Tracks the health of one upstream API and fails fast while it is down.
+
+    States:
+        closed    - calls go through; failures and slow calls are counted
+        open      - calls are rejected immediately until recovery_timeout passes
+        half_open - a single probe call is let through to test the upstream
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 3,
+                 latency_threshold: float = 5.0,
+                 recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failure_count = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Returns True if a call to the upstream should be attempted."""
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            # Half-open: only one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        """Records a completed call. Calls slower than latency_threshold count as failures."""
+
+        if latency > self.latency_threshold:
+            self.record_failure(f"slow response ({latency:.1f}s > {self.latency_threshold:.1f}s)")
+            return
+
+        with self._lock:
+            self.state = self.CLOSED
+            self.failure_count = 0
+            self.opened_at = None
+            self.last_error = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error: str):
+        """Records a failed call and opens the circuit if needed."""
+
+        with self._lock:
+            self.failure_count += 1
+            self.last_error = error
+            self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN or self.failure_count >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def status(self) -> str:
+        """Short human-readable description of the breaker state."""
+
+        if self.state == self.CLOSED:
+            return f"{self.name}: closed"
+        return f"{self.name}: {self.state} ({self.last_error})"
+
+
+if __name__ == "__main__":
+    breaker = CircuitBreaker("demo", failure_threshold=2, latency_threshold=1.0, recovery_timeout=0.5)
+
+    print(f"Allow: {breaker.allow_request()} -> {breaker.status()}")
+    breaker.record_failure("API returned status code 503")
+    breaker.record_success(latency=2.5)
+    print(f"Allow: {breaker.allow_request()} -> {breaker.status()}")
+
+    time.sleep(0.6)
+    print(f"Probe allowed: {breaker.allow_request()} -> {breaker.status()}")
+    print(f"Second probe allowed: {breaker.allow_request()}")
+    breaker.record_success(latency=0.2)
+    print(f"After probe: {breaker.status()}")
@@ -0,0 +1,392 @@
+import os
+import re
+import json
+import threading
+import requests
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Used until a /coins/list snapshot is available (e.g. first run without network)
+SEED_COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    {"id": "ripple", "symbol": "xrp", "name": "XRP"},
+    {"id": "solana", "symbol": "sol", "name": "Solana"},
+    {"id": "dogecoin", "symbol": "doge", "name": "Dogecoin"},
+    {"id": "cardano", "symbol": "ada", "name": "Cardano"},
+    {"id": "litecoin", "symbol": "ltc", "name": "Litecoin"},
+]
+
+EXTRA_ALIASES = {
+    "ripple": "ripple",
+    "ether": "ethereum",
+    "doge": "dogecoin",
+}
+
+# Words that happen to be coin symbols or names but are almost never meant as one
+STOPWORDS = {
+    "a", "an", "and", "the", "me", "my", "is", "it", "of", "on", "in", "to", "for", "how",
+    "what", "whats", "give", "show", "news", "price", "prices", "trend", "trends", "days",
+    "day", "week", "month", "over", "past", "last", "near", "one", "just", "now", "up",
+    "down", "move", "hot", "key", "sun", "gas", "analyze", "analysis", "doing", "lately",
+    "story", "safe", "flow", "trump", "buy", "sell", "hold", "about",
+}
+
+# Lowercase words in free text only count as coins for the biggest coins
+TEXT_LOWERCASE_MAX_RANK = 100
+
+UNRANKED = float("inf")
+
+
+def _normalize(text: str) -> str:
+    """Lowercases and strips everything but letters and digits."""
+
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _deletes(key: str) -> List[str]:
+    """All variants of key with one character removed."""
+
+    return [key[:i] + key[i + 1:] for i in range(len(key))]
+
+
+class CoinIndex:
+    """Resolves user-supplied coin names, symbols and misspellings to CoinGecko IDs.
+
+    Lookups are dictionary hits against an index built from a cached
+    /coins/list snapshot. Symbols shared by several coins go to the one with
+    the largest market cap.
+    """
+
+    # Lower is better when several coins claim the same key
+    KIND_PRIORITY = {"id": 0, "name": 1, "symbol": 2}
+
+    def __init__(self,
+                 cache_path: str = os.path.join("cache", "coins_list.json"),
+                 refresh_interval: timedelta = timedelta(hours=24),
+                 ranked_pages: int = 2,
+                 timeout: float = 10.0):
+        self.base_url = "https://api.coingecko.com/api/v3"
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self.ranked_pages = ranked_pages
+        self.timeout = timeout
+
+        self.fetched_at: Optional[datetime] = None
+
+        # (exact, fuzzy, text, names) - swapped in as one tuple so readers never see a half-built index
+        self._index: Optional[Tuple[Dict[str, str], Dict[str, str], Dict[str, Tuple[str, str, float]], Dict[str, str]]] = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Returns the CoinGecko ID for a name, symbol or near-miss spelling, or None."""
+
+        exact, fuzzy, _, _ = self._get_index()
+        key = _normalize(query)
+        if not key:
+            return None
+
+        if key in exact:
+            return exact[key]
+
+        return self._fuzzy_lookup(key, exact, fuzzy)
+
+    def name_for(self, coin_id: str) -> str:
+        """Display name for a CoinGecko ID."""
+
+        return self._get_index()[3].get(coin_id, coin_id.title())
+
+    def find_in_text(self, text: str) -> Optional[str]:
+        """Finds the best-ranked well-known coin mentioned in free text and returns its display name.
+
+        Every mention is collected first, so "Is it safe to buy Ethereum?" picks
+        Ethereum over a smaller coin that happens to be called Safe.
+        """
+
+        exact, fuzzy, text_keys, _ = self._get_index()
+        tokens = re.findall(r"[A-Za-z0-9]+", text)
+        candidates = []
+
+        for i, token in enumerate(tokens):
+            # Two-word names such as "Bitcoin Cash" or "Shiba Inu"
+            if i + 1 < len(tokens):
+                match = text_keys.get(_normalize(token + tokens[i + 1]))
+                if match and match[1] != "symbol":
+                    candidates.append((match[2], i, match[0]))
+
+            key = _normalize(token)
+            match = text_keys.get(key)
+            if match and self._is_text_mention(token, key, match[1], match[2]):
+                candidates.append((match[2], i, match[0]))
+
+        if candidates:
+            return self.name_for(min(candidates)[2])
+
+        # Only try misspellings once nothing matched exactly; words that are
+        # already known keys were rejected above and must not sneak back in
+        for token in tokens:
+            key = _normalize(token)
+            if len(key) >= 6 and key not in STOPWORDS and key not in exact:
+                coin_id = self._fuzzy_lookup(key, exact, fuzzy)
+                if coin_id:
+                    return self.name_for(coin_id)
+
+        return None
+
+    def _is_text_mention(self, token: str, key: str, kind: str, rank: float) -> bool:
+        """Decides whether a single word that matches a coin is meant as one.
+
+        All-caps tickers ("NEAR", "BTC") always count. Other words must not be
+        stopwords; capitalized names count for any ranked coin, but lowercase
+        words and non-caps symbols only count for the biggest coins, so
+        ordinary words like "story" or "flow" do not become coins.
+        """
+
+        if len(key) < 2:
+            return False
+        if token.isupper():
+            return len(key) >= 3 or key not in STOPWORDS
+        if key in STOPWORDS:
+            return False
+        if kind != "symbol" and token[0].isupper():
+            return True
+        return rank <= TEXT_LOWERCASE_MAX_RANK
+
+    def refresh(self) -> bool:
+        """Downloads a fresh coin list and market-cap ranking, saves the snapshot and swaps in a new index.
+
+        Returns False and keeps the current index if either download fails, so a
+        rate-limited ranking request never produces a fresh-looking snapshot
+        that resolves ambiguous symbols without market caps.
+        """
+
+        try:
+            response = requests.get(f"{self.base_url}/coins/list", timeout=self.timeout)
+            if response.status_code != 200:
+                print(f"⚠️  Coin list refresh failed: API returned status code {response.status_code}")
+                return False
+            coins = response.json()
+
+            ranks = {}
+            for page in range(1, self.ranked_pages + 1):
+                response = requests.get(
+                    f"{self.base_url}/coins/markets",
+                    params={"vs_currency": "usd", "order": "market_cap_desc", "per_page": 250, "page": page},
+                    timeout=self.timeout,
+                )
+                if response.status_code != 200:
+                    print(f"⚠️  Coin ranking refresh failed: API returned status code {response.status_code}")
+                    return False
+
+                markets = response.json()
+                if not isinstance(markets, list):
+                    print("⚠️  Coin ranking refresh failed: unexpected response")
+                    return False
+                if not markets:
+                    break
+                for market in markets:
+                    if isinstance(market, dict) and market.get("id") and market.get("market_cap_rank"):
+                        ranks[market["id"]] = market["market_cap_rank"]
+
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️  Coin list refresh failed: {e}")
+            return False
+
+        snapshot = {"fetched_at": datetime.now().isoformat(), "coins": coins, "ranks": ranks}
+        if not self._is_valid_snapshot(snapshot):
+            print("⚠️  Coin list refresh failed: unexpected response")
+            return False
+
+        self._save_snapshot(snapshot)
+        self._apply_snapshot(snapshot)
+        return True
+
+    def start_background_refresh(self):
+        """Keeps the index fresh from a daemon thread, refreshing immediately if the snapshot is stale."""
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="coin-index-refresh", daemon=True)
+        self._thread.start()
+
+    def stop_background_refresh(self):
+        """Stops the background refresh thread."""
+
+        self._stop.set()
+
+    def _refresh_loop(self):
+        """Background loop: refresh when stale, then sleep until the next refresh is due."""
+
+        self._get_index()
+
+        while not self._stop.is_set():
+            if self._is_stale():
+                self.refresh()
+
+            # Retry sooner after a failed refresh
+            if self._is_stale():
+                wait = timedelta(minutes=5)
+            else:
+                wait = self.refresh_interval - (datetime.now() - self.fetched_at)
+            self._stop.wait(max(wait.total_seconds(), 1))
+
+    def _is_stale(self) -> bool:
+        """True if there is no snapshot or it is older than refresh_interval."""
+
+        return self.fetched_at is None or datetime.now() - self.fetched_at > self.refresh_interval
+
+    def _get_index(self):
+        """Loads the index on first use from the cached snapshot, or the seed list."""
+
+        if self._index is None:
+            with self._load_lock:
+                if self._index is None:
+                    snapshot = self._load_snapshot()
+                    if snapshot:
+                        self._apply_snapshot(snapshot)
+                    else:
+                        self._index = self._build([], {})
+        return self._index
+
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Reads the cached /coins/list snapshot from disk."""
+
+        if not os.path.exists(self.cache_path):
+            return None
+
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable coin list cache: {e}")
+            return None
+
+        if not self._is_valid_snapshot(snapshot):
+            print("⚠️  Ignoring malformed coin list cache")
+            return None
+
+        return snapshot
+
+    def _is_valid_snapshot(self, snapshot: Any) -> bool:
+        """Checks a snapshot has the shape _apply_snapshot expects."""
+
+        if not isinstance(snapshot, dict):
+            return False
+
+        try:
+            datetime.fromisoformat(snapshot["fetched_at"])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        coins = snapshot.get("coins")
+        ranks = snapshot.get("ranks")
+        if not isinstance(coins, list) or not isinstance(ranks, dict):
+            return False
+
+        return all(isinstance(rank, (int, float)) and not isinstance(rank, bool) for rank in ranks.values())
+
+    def _save_snapshot(self, snapshot: Dict[str, Any]):
+        """Writes the snapshot atomically so a crash never leaves a truncated cache."""
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not save coin list cache: {e}")
+
+    def _apply_snapshot(self, snapshot: Dict[str, Any]):
+        """Builds an index from a snapshot and swaps it in."""
+
+        self._index = self._build(snapshot.get("coins", []), snapshot.get("ranks", {}))
+        self.fetched_at = datetime.fromisoformat(snapshot["fetched_at"])
+
+    def _build(self, coins: List[Dict[str, str]], ranks: Dict[str, int]):
+        """Precomputes every lookup table from the coin list."""
+
+        # Seed coins always outrank unranked clones that reuse their symbols
+        ranks = dict(ranks)
+        for position, coin in enumerate(SEED_COINS, 1):
+            ranks.setdefault(coin["id"], position)
+
+        best: Dict[str, Tuple[float, int, str]] = {}
+        names: Dict[str, str] = {}
+
+        def claim(table: Dict[str, Tuple[float, int, str]], key: str, coin_id: str, kind: str):
+            candidate = (ranks.get(coin_id, UNRANKED), self.KIND_PRIORITY[kind], coin_id)
+            if key and (key not in table or candidate < table[key]):
+                table[key] = candidate
+
+        for coin in SEED_COINS + coins:
+            coin_id = coin.get("id") if isinstance(coin, dict) else None
+            if not coin_id or not isinstance(coin_id, str):
+                continue
+            name = coin.get("name") if isinstance(coin.get("name"), str) else ""
+            symbol = coin.get("symbol") if isinstance(coin.get("symbol"), str) else ""
+            names.setdefault(coin_id, name or coin_id)
+
+            claim(best, _normalize(coin_id), coin_id, "id")
+            claim(best, _normalize(name), coin_id, "name")
+            claim(best, _normalize(symbol), coin_id, "symbol")
+
+        for alias, coin_id in EXTRA_ALIASES.items():
+            claim(best, alias, coin_id, "id")
+
+        exact = {key: coin_id for key, (_, _, coin_id) in best.items()}
+
+        # Only ranked coins take part in misspelling and free-text matching, which
+        # keeps those tables small and stops obscure coins shadowing English words
+        ranked_keys = {key: value for key, value in best.items() if value[0] != UNRANKED}
+
+        fuzzy_best: Dict[str, Tuple[float, int, str]] = {}
+        for key, (rank, priority, coin_id) in ranked_keys.items():
+            if len(key) < 5 or priority == self.KIND_PRIORITY["symbol"]:
+                continue
+            for variant in [key] + _deletes(key):
+                candidate = (rank, priority, coin_id)
+                if variant not in fuzzy_best or candidate < fuzzy_best[variant]:
+                    fuzzy_best[variant] = candidate
+        fuzzy = {key: coin_id for key, (_, _, coin_id) in fuzzy_best.items()}
+
+        kinds = {value: kind for kind, value in self.KIND_PRIORITY.items()}
+        text_keys = {key: (coin_id, kinds[priority], rank) for key, (rank, priority, coin_id) in ranked_keys.items()}
+
+        return exact, fuzzy, text_keys, names
+
+    def _fuzzy_lookup(self, key: str, exact: Dict[str, str], fuzzy: Dict[str, str]) -> Optional[str]:
+        """Matches keys one edit away from a known name (symmetric-delete lookup)."""
+
+        if len(key) < 4:
+            return None
+
+        # Missing letter: "etherum" is a deletion of "ethereum"
+        if key in fuzzy:
+            return fuzzy[key]
+
+        # Extra letter: "bitcoinn" -> "bitcoin"
+        # Wrong letter: "solama" and "solana" share the deletion "solaa"
+        for variant in _deletes(key):
+            if variant in fuzzy:
+                return fuzzy[variant]
+
+        return None
+
+
+if __name__ == "__main__":
+    index = CoinIndex()
+
+    print("Refreshing coin list from CoinGecko...")
+    index.refresh()
+
+    for query in ["Solana", "SOL", "Dogecoin", "btc", "Etherium", "bitcoinn", "XRP", "shiba inu"]:
+        print(f"{query} -> {index.resolve(query)}")
+
+    for text in ["How's BTC doing lately?", "Give me Solana news only", "Show me etherium price trends"]:
+        print(f"'{text}' -> {index.find_in_text(text)}")
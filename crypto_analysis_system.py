@@ -1,4 +1,8 @@
 import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Tuple
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 
@@ -6,12 +10,19 @@ from customer_communicator import CustomerCommunicator, CryptoAnalysisRequest
 from price_analyzer import PriceAnalyzer
 from news_analyzer import NewsAnalyzer
 from report_writer import ReportWriter
+from circuit_breaker import CircuitBreaker
+from coin_index import CoinIndex
 
 load_dotenv()
 
 class CryptoAnalysisSystem:
     """Main orchestrator - brings all agents together"""
 
+    # Fallback cache limits: older data is not worth serving, and keys come from
+    # user input so the number of entries has to be bounded
+    CACHE_MAX_AGE = timedelta(hours=1)
+    CACHE_MAX_ENTRIES = 128
+
     def __init__(self):
         self.llm = ChatGroq(
             api_key=os.getenv("GROQ_API_KEY"),
@@ -22,11 +33,25 @@ class CryptoAnalysisSystem:
             max_retries=2,
         )
 
-        self.customer_comm = CustomerCommunicator()
-        self.price_analyzer = PriceAnalyzer()
+        # Shared by the parser and the price fetcher so both resolve coins the same way
+        self.coin_index = CoinIndex()
+        self.coin_index.start_background_refresh()
+
+        self.customer_comm = CustomerCommunicator(coin_index=self.coin_index)
+        self.price_analyzer = PriceAnalyzer(coin_index=self.coin_index)
         self.news_analyzer = NewsAnalyzer()
         self.report_writer = ReportWriter(self.llm)
 
+        # One breaker per upstream so a slow/failing API fails fast instead of
+        # adding its timeout to every request
+        self.breakers = {
+            "exa": CircuitBreaker("exa", latency_threshold=8.0),
+            "coingecko": CircuitBreaker("coingecko", latency_threshold=5.0),
+        }
+
+        # Last good response per (upstream, key), used when an upstream is degraded (LRU order)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[datetime, Any]]" = OrderedDict()
+
         print("✅ Crypto Analysis System initialized!")
 
     def analyze(self, user_input: str) -> str:
@@ -46,17 +71,35 @@ class CryptoAnalysisSystem:
         print(f"   ✓ Include Price: {request.include_price_analysis}\n")
 
         # Step 2: Fetch data
+        coin_id = self.price_analyzer.get_coin_id(request.cryptocurrency)
         news_data = []
         price_data = {}
+        degraded = {}
 
         if request.include_news:
             print("📡 Fetching news data...")
-            news_data = self.news_analyzer.fetch_news(request.cryptocurrency, num_results=10)
+            news_data, note = self._fetch_with_breaker(
+                "exa",
+                coin_id,
+                lambda: self.news_analyzer.fetch_news(request.cryptocurrency, num_results=10),
+                fallback=lambda reason: [],
+            )
+            if note:
+                degraded["news"] = note
+                print(f"   ⚠️  News degraded: {note}")
             print(f"   ✓ Retrieved {len(news_data)} news articles.\n")
 
         if request.include_price_analysis:
             print("📡 Fetching price data...")
-            price_data = self.price_analyzer.fetch_price_data(request.cryptocurrency, days=request.days_history)
+            price_data, note = self._fetch_with_breaker(
+                "coingecko",
+                f"{coin_id}:{request.days_history}",
+                lambda: self.price_analyzer.fetch_price_data(request.cryptocurrency, days=request.days_history),
+                fallback=lambda reason: {"error": reason},
+            )
+            if note:
+                degraded["price"] = note
+                print(f"   ⚠️  Price degraded: {note}")
             if "error" in price_data:
                 print(f"   ⚠️  Price data error: {price_data['error']}\n")
             else:
@@ -67,11 +110,82 @@ class CryptoAnalysisSystem:
         report = self.report_writer.generate_report(
             request.cryptocurrency,
             news_data,
-            price_data
+            price_data,
+            degraded
         )
         print("   ✓ Report generation complete!\n")
 
         return report
+
+    def _fetch_with_breaker(self,
+                            upstream: str,
+                            key: str,
+                            fetch: Callable[[], Any],
+                            fallback: Callable[[str], Any]) -> Tuple[Any, str]:
+        """Calls an upstream through its circuit breaker.
+
+        Returns (data, note). note is empty when the data is fresh, otherwise it
+        explains why cached/stale or fallback data was used. Only transport
+        errors, timeouts, 5xx and 429 count against the breaker; errors caused
+        by the request itself (e.g. a 404 for an unknown coin or a 401 for a
+        bad API key) go straight to fallback(error), still with a note so the
+        report does not claim the section is live.
+        """
+
+        breaker = self.breakers[upstream]
+
+        if breaker.allow_request():
+            start = time.monotonic()
+            try:
+                data = fetch()
+            except Exception as e:
+                data = {"error": f"Request failed: {e}", "retryable": True}
+            latency = time.monotonic() - start
+
+            # Analyzers report failures as {"error": ..., "retryable": ...}
+            if not (isinstance(data, dict) and "error" in data):
+                breaker.record_success(latency)
+                self._store_cached(upstream, key, data)
+                return data, ""
+
+            if not data.get("retryable"):
+                # The upstream answered, so it is healthy even though the request failed
+                breaker.record_success(latency)
+                return fallback(data["error"]), f"{upstream} rejected the request ({data['error']})"
+
+            breaker.record_failure(data["error"])
+            reason = data["error"]
+        else:
+            reason = f"{upstream} circuit open after repeated failures ({breaker.last_error})"
+
+        cached = self._get_cached(upstream, key)
+        if cached:
+            fetched_at, data = cached
+            return data, f"{reason}; using cached data from {fetched_at:%Y-%m-%d %H:%M}"
+
+        return fallback(reason), f"{reason}; no cached data available"
+
+    def _store_cached(self, upstream: str, key: str, data: Any):
+        """Saves a good response, evicting the least recently used entry when full."""
+
+        self._cache[(upstream, key)] = (datetime.now(), data)
+        self._cache.move_to_end((upstream, key))
+        while len(self._cache) > self.CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def _get_cached(self, upstream: str, key: str) -> Any:
+        """Returns (fetched_at, data) if a cached response is recent enough to serve, else None."""
+
+        cached = self._cache.get((upstream, key))
+        if not cached:
+            return None
+
+        if datetime.now() - cached[0] > self.CACHE_MAX_AGE:
+            del self._cache[(upstream, key)]
+            return None
+
+        self._cache.move_to_end((upstream, key))
+        return cached
     
 if __name__ == "__main__":
     print("🚀 CRYPTOCURRENCY ANALYSIS AI SYSTEM")
@@ -3,6 +3,7 @@ import json
 from dataclasses import dataclass
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
+from coin_index import CoinIndex
 
 load_dotenv()
 
@@ -17,9 +18,10 @@ class CryptoAnalysisRequest:
 class CustomerCommunicator:
     """Parses user input using LLM"""
 
-    def __init__(self, groq_api_key: str = None):
+    def __init__(self, groq_api_key: str = None, coin_index: CoinIndex = None):
         self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
         self.llm = ChatGroq(api_key=self.groq_api_key, model="llama-3.3-70b-versatile")
+        self.coin_index = coin_index or CoinIndex()
 
     def parse_user_request(self, user_input: str) -> CryptoAnalysisRequest:
         """Convert natural language to structured request"""
@@ -58,16 +60,7 @@ class CustomerCommunicator:
         user_input_lower = user_input.lower()
 
         # Default values
-        if "ethereum" in user_input_lower or "eth" in user_input_lower:
-            crypto = "Ethereum"
-        elif "cardano" in user_input_lower or "ada" in user_input_lower:
-            crypto = "Cardano"
-        elif "solana" in user_input_lower or "sol" in user_input_lower:
-            crypto = "Solana"
-        elif "litecoin" in user_input_lower or "ltc" in user_input_lower:
-            crypto = "Litecoin"
-        else:
-            crypto = "Bitcoin"
+        crypto = self.coin_index.find_in_text(user_input) or "Bitcoin"
         
         days_history = 7
         if "14 days" in user_input_lower or "two weeks" in user_input_lower:
@@ -3,15 +3,17 @@ import requests
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from circuit_breaker import is_retryable_status
 
 load_dotenv()
 
 class NewsAnalyzer:
     """Fetches and analyzes cryptocurrency news articles."""
 
-    def __init__(self, exa_api_key: str = None):
+    def __init__(self, exa_api_key: str = None, timeout: float = 10.0):
         self.exa_api_key = os.getenv("EXA_API_KEY")
         self.base_url = "https://api.exa.ai/search"
+        self.timeout = timeout
 
     def fetch_news(self, cryptocurrency: str, num_results: int = 10) -> List[Dict[str, Any]]:
         """Fetch recent news articles about a given cryptocurrency."""
@@ -35,13 +37,20 @@ class NewsAnalyzer:
         
         }
 
-        response = requests.post(self.base_url, json=payload, headers=headers)
+        try:
+            response = requests.post(self.base_url, json=payload, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            return {"error": f"Request failed: {e}", "retryable": True}
 
         if response.status_code == 200:
             data = response.json()
             return data.get("results", [])
         else:
-            return {"error": f"API returned status code {response.status_code}"}
+            return {
+                "error": f"API returned status code {response.status_code}",
+                "status_code": response.status_code,
+                "retryable": is_retryable_status(response.status_code),
+            }
         
     def analyze_sentiment_individual(self, text: str) -> str:
         """Analyzes sentiment of a single news article text."""
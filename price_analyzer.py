@@ -1,29 +1,21 @@
 import requests
 from datetime import datetime
 from typing import Dict, Any
+from coin_index import CoinIndex
+from circuit_breaker import is_retryable_status
 
 class PriceAnalyzer:
     """Fetches and analyzes cryptocurrency price data."""
 
-    def __init__(self):
+    def __init__(self, timeout: float = 10.0, coin_index: CoinIndex = None):
         self.base_url = "https://api.coingecko.com/api/v3"
-
-        self.coin_map={
-            "bitcoin": "bitcoin",
-            "btc": "bitcoin",
-            "ethereum": "ethereum",
-            "eth": "ethereum",
-            "ripple": "ripple",
-            "litecoin": "litecoin"
-        }
+        self.timeout = timeout
+        self.coin_index = coin_index or CoinIndex()
     
     def get_coin_id(self, cryptocurrency: str) -> str:
         """converts user input to CoinGecko IDs."""
 
-        if cryptocurrency.lower() in self.coin_map:
-            return self.coin_map[cryptocurrency.lower()]
-        
-        return cryptocurrency.lower()
+        return self.coin_index.resolve(cryptocurrency) or cryptocurrency.lower()
     
     def process_price_data(self, data: Dict, cryptocurrency: str) -> Dict[str, Any]:
         """Process raw API data into useful metrics"""
@@ -66,11 +58,18 @@ class PriceAnalyzer:
             "days": days,
             "interval": "daily"
         }
-        response = requests.get(url, params=params)
+        try:
+            response = requests.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            return {"error": f"Request failed: {e}", "retryable": True}
         if response.status_code == 200:
             return self.process_price_data(response.json(), cryptocurrency)
         else:
-            return {"error": f"API returned status code {response.status_code}"}
+            return {
+                "error": f"API returned status code {response.status_code}",
+                "status_code": response.status_code,
+                "retryable": is_retryable_status(response.status_code),
+            }
     
 if __name__ == "__main__":
     analyzer = PriceAnalyzer()
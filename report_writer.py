@@ -10,11 +10,17 @@ class ReportWriter:
     def generate_report(self, 
                         crypto: str, 
                         news_data: List[Dict],
-                        price_data: Dict) -> str:
-        """Generates a comprehensive anaysis report."""
+                        price_data: Dict,
+                        degraded: Dict[str, str] = None) -> str:
+        """Generates a comprehensive anaysis report.
+
+        degraded maps a section ("news", "price") to the reason its data is
+        stale or missing, so the report can say so instead of guessing.
+        """
 
         news_summary = self._format_news(news_data)
         price_summary = self._format_price_data(price_data)
+        degraded_summary = self._format_degraded(degraded or {})
 
         prompt = f"""You are a professional cryptocurrency analyst. 
                     Generate a comprehensive market analysis report.
@@ -27,6 +33,9 @@ class ReportWriter:
                     RECENT NEWS:
                     {news_summary}
 
+                    DATA QUALITY:
+                    {degraded_summary}
+
                     Generate a professional report with these sections:
                     1. Executive Summary (2-3 sentences overview)
                     2. Price Analysis (discuss trends, volatility, key levels)
@@ -35,6 +44,7 @@ class ReportWriter:
                     5. Outlook & Recommendations (what should investors watch?)
 
                     Keep it professional, data-driven, and actionable. Use the actual numbers provided.
+                    If any data is marked as degraded, say so clearly in the affected sections.
 
                     Report:
                 """
@@ -61,6 +71,14 @@ class ReportWriter:
 
         return "\n\n".join(formatted)
     
+    def _format_degraded(self, degraded: Dict[str, str]) -> str:
+        """Format degraded data sources for the LLM."""
+
+        if not degraded:
+            return "All data sources are live."
+
+        return "\n".join(f"- {section.title()} data is degraded: {reason}" for section, reason in degraded.items())
+
     def _format_price_data(self, price_data: Dict) -> str:
         """Format price data for the LLM."""
 
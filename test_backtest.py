@@ -0,0 +1,201 @@
+import csv
+import json
+
+import pytest
+
+from backtest import BacktestRunner
+
+DAY_MS = 86_400_000
+JAN_1_2020_MS = 1_577_836_800_000
+
+BITCOIN_PRICES = [100, 110, 99, 120, 132]
+DOGECOIN_PRICES = [1, 2, 4, 2]
+
+
+@pytest.fixture
+def prices_path(tmp_path):
+    path = tmp_path / "prices.csv"
+    rows = [["coin", "timestamp", "price"]]
+
+    for day in range(max(len(BITCOIN_PRICES), len(DOGECOIN_PRICES))):
+        timestamp = JAN_1_2020_MS + day * DAY_MS
+        if day < len(BITCOIN_PRICES):
+            rows.append(["bitcoin", timestamp, BITCOIN_PRICES[day]])
+        if day < len(DOGECOIN_PRICES):
+            rows.append(["dogecoin", timestamp, DOGECOIN_PRICES[day]])
+        if day == 1:
+            # Bad rows are skipped without breaking the series
+            rows.append(["bitcoin", timestamp, 0])
+            rows.append(["bitcoin", "not a timestamp", 105])
+            rows.append(["dogecoin", timestamp, -3])
+
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def news_path(tmp_path):
+    path = tmp_path / "news.jsonl"
+    articles = [
+        {"coin": "bitcoin", "published_date": "2020-01-01T10:00:00Z", "text": "Bitcoin surge"},
+        {"coin": "bitcoin", "published_date": "2020-01-02T10:00:00Z", "text": "Price crash"},
+        {"coin": "bitcoin", "published_date": "2020-01-02T12:00:00Z", "text": "Another crash"},
+        {"coin": "bitcoin", "published_date": "2020-01-03T10:00:00Z", "text": "Big gain"},
+        {"coin": "bitcoin", "published_date": "2020-01-03T11:00:00Z", "text": "More gain"},
+        {"coin": "bitcoin", "published_date": "2020-01-03T12:00:00Z", "text": "Gain again"},
+        {"coin": None, "published_date": "2020-01-02T10:00:00Z", "text": "Unattributed crash"},
+    ]
+
+    with open(path, "w") as f:
+        for article in articles:
+            f.write(json.dumps(article) + "\n")
+        f.write(json.dumps({"coin": 5, "published_date": "2020-01-02", "text": "bad coin"}) + "\n")
+        f.write(json.dumps({"coin": "bitcoin", "text": "no date"}) + "\n")
+        f.write("not json\n")
+    return str(path)
+
+
+def run(tmp_path, prices_path, news_path=None, **kwargs):
+    kwargs.setdefault("workers", 2)
+    output_path = tmp_path / "results.csv"
+    runner = BacktestRunner(window=2, horizon=1, **kwargs)
+    summary = runner.run(prices_path, str(output_path), news_path=news_path)
+
+    with open(output_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    return summary, rows
+
+
+def test_window_count_and_forward_returns(tmp_path, prices_path):
+    summary, rows = run(tmp_path, prices_path)
+
+    assert summary["windows"] == 5
+    assert summary["skipped_rows"] == 3
+
+    bitcoin = [row for row in rows if row["coin"] == "bitcoin"]
+    dogecoin = [row for row in rows if row["coin"] == "dogecoin"]
+    assert [float(row["forward_return_percent"]) for row in bitcoin] == [-10.0, 21.2121, 10.0]
+    assert [float(row["forward_return_percent"]) for row in dogecoin] == [100.0, -50.0]
+    assert [row["momentum_signal"] for row in bitcoin] == ["bullish", "bearish", "bullish"]
+
+
+def test_momentum_hit_rate(tmp_path, prices_path):
+    summary, _ = run(tmp_path, prices_path)
+
+    assert summary["momentum"] == {
+        "signals": 5,
+        "hit_rate": 40.0,
+        "avg_forward_return_bullish": 12.5,
+        "avg_forward_return_bearish": 21.2121,
+    }
+
+
+def test_sentiment_is_scored_per_coin(tmp_path, prices_path, news_path):
+    summary, rows = run(tmp_path, prices_path, news_path)
+
+    bitcoin = [row for row in rows if row["coin"] == "bitcoin"]
+    assert [row["sentiment"] for row in bitcoin] == ["positive", "negative", "positive"]
+    assert [int(row["positive_articles"]) for row in bitcoin] == [1, 0, 3]
+    assert [int(row["negative_articles"]) for row in bitcoin] == [0, 2, 0]
+
+    # Bitcoin news must not leak into dogecoin windows
+    dogecoin = [row for row in rows if row["coin"] == "dogecoin"]
+    assert all(row["sentiment"] == "" and row["sentiment_signal"] == "" for row in dogecoin)
+
+    assert summary["sentiment"]["signals"] == 3
+    assert summary["sentiment"]["hit_rate"] == 33.33
+    assert summary["skipped_articles"] == 3
+
+
+def test_sentiment_ignores_news_after_window_end(tmp_path):
+    prices = tmp_path / "prices.csv"
+    with open(prices, "w", newline="") as f:
+        csv.writer(f).writerows([
+            ["coin", "timestamp", "price"],
+            ["bitcoin", "2024-01-01T00:00:00Z", 100],
+            ["bitcoin", "2024-01-02T00:00:00Z", 100],
+            ["bitcoin", "2024-01-03T00:00:00Z", 150],
+        ])
+
+    news = tmp_path / "news.jsonl"
+    with open(news, "w") as f:
+        # Published during the forward-return period, so it must not be counted
+        f.write(json.dumps({"coin": "bitcoin", "published_date": "2024-01-02T18:00:00Z", "text": "bitcoin surge"}) + "\n")
+
+    summary, rows = run(tmp_path, str(prices), str(news))
+
+    assert len(rows) == 1
+    assert rows[0]["window_end"] == "2024-01-02T00:00:00+00:00"
+    assert rows[0]["sentiment_signal"] == ""
+    assert summary["sentiment"]["signals"] == 0
+
+    with open(news, "a") as f:
+        # Published exactly at the window's last price point, so it is counted
+        f.write(json.dumps({"coin": "bitcoin", "published_date": "2024-01-02T00:00:00Z", "text": "price crash"}) + "\n")
+
+    summary, rows = run(tmp_path, str(prices), str(news))
+
+    assert rows[0]["sentiment"] == "negative"
+    assert (rows[0]["positive_articles"], rows[0]["negative_articles"]) == ("0", "1")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_chunk_boundaries_do_not_change_results(tmp_path, prices_path, news_path, chunk_size):
+    _, expected = run(tmp_path, prices_path, news_path, chunk_size=10_000)
+    _, rows = run(tmp_path, prices_path, news_path, chunk_size=chunk_size)
+
+    key = lambda row: (row["coin"], row["window_start"])
+    assert sorted(rows, key=key) == sorted(expected, key=key)
+
+
+def test_step_skips_windows(tmp_path, prices_path):
+    _, rows = run(tmp_path, prices_path, step=2, chunk_size=2)
+
+    assert [(row["coin"], row["forward_return_percent"]) for row in rows if row["coin"] == "bitcoin"] == [
+        ("bitcoin", "-10.0"), ("bitcoin", "10.0")
+    ]
+    assert len([row for row in rows if row["coin"] == "dogecoin"]) == 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 10_000])
+def test_out_of_order_rows_fail(tmp_path, chunk_size):
+    path = tmp_path / "unordered.csv"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows([
+            ["coin", "timestamp", "price"],
+            ["bitcoin", JAN_1_2020_MS + DAY_MS, 100],
+            ["bitcoin", JAN_1_2020_MS, 101],
+        ])
+
+    with pytest.raises(ValueError, match="not in time order"):
+        run(tmp_path, str(path), chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("option", ["window", "step", "horizon", "chunk_size"])
+def test_rejects_non_positive_options(option):
+    with pytest.raises(ValueError, match=option):
+        BacktestRunner(**{option: 0})
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 10_000])
+def test_parquet_row_groups_are_split_into_chunks(tmp_path, prices_path, chunk_size):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    with open(prices_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    table = pa.table({
+        "coin": [row["coin"] for row in rows],
+        "timestamp": [row["timestamp"] for row in rows],
+        "price": [float(row["price"]) for row in rows],
+    })
+    parquet_path = tmp_path / "prices.parquet"
+    pq.write_table(table, parquet_path, row_group_size=5)
+
+    expected_summary, expected = run(tmp_path, prices_path)
+    summary, rows = run(tmp_path, str(parquet_path), chunk_size=chunk_size)
+
+    key = lambda row: (row["coin"], row["window_start"])
+    assert sorted(rows, key=key) == sorted(expected, key=key)
+    assert summary == expected_summary
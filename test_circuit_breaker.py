@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from datetime import timedelta
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, is_retryable_status
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+def make_breaker():
+    return CircuitBreaker("test", failure_threshold=3, latency_threshold=1.0, recovery_timeout=30.0)
+
+
+def test_opens_after_failure_threshold(clock):
+    breaker = make_breaker()
+
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure("API returned status code 503")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure("API returned status code 503")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = make_breaker()
+
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    breaker.record_success(latency=0.1)
+    breaker.record_failure("timeout")
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failure_count == 1
+
+
+def test_slow_success_counts_as_failure(clock):
+    breaker = make_breaker()
+
+    for _ in range(3):
+        breaker.record_success(latency=2.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert "slow response" in breaker.last_error
+
+
+def test_half_open_allows_single_probe(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure("timeout")
+
+    clock.now += 29
+    assert not breaker.allow_request()
+
+    clock.now += 2
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_successful_probe_closes_circuit(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure("timeout")
+
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.record_success(latency=0.1)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_circuit(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure("timeout")
+
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.record_failure("timeout")
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    # The recovery timeout restarts from the failed probe
+    clock.now += 31
+    assert breaker.allow_request()
+
+
+def test_slow_probe_reopens_circuit(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure("timeout")
+
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.record_success(latency=5.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.parametrize("status_code, expected", [(404, False), (400, False), (429, True), (500, True), (503, True)])
+def test_is_retryable_status(status_code, expected):
+    assert is_retryable_status(status_code) is expected
+
+
+class TestFetchWithBreaker:
+    """Exercises CryptoAnalysisSystem._fetch_with_breaker without constructing the LLM."""
+
+    @pytest.fixture
+    def system(self):
+        crypto_analysis_system = pytest.importorskip("crypto_analysis_system")
+
+        system = crypto_analysis_system.CryptoAnalysisSystem.__new__(crypto_analysis_system.CryptoAnalysisSystem)
+        system.breakers = {"coingecko": CircuitBreaker("coingecko", failure_threshold=3)}
+        system._cache = OrderedDict()
+        return system
+
+    def fetch(self, system, key, result):
+        return system._fetch_with_breaker("coingecko", key, lambda: result, fallback=lambda reason: {"error": reason})
+
+    def test_client_errors_do_not_open_breaker(self, system):
+        not_found = {"error": "API returned status code 404", "status_code": 404, "retryable": False}
+
+        for _ in range(5):
+            data, note = self.fetch(system, "notacoin:7", not_found)
+            assert data == {"error": "API returned status code 404"}
+            assert "status code 404" in note
+
+        assert system.breakers["coingecko"].state == CircuitBreaker.CLOSED
+
+        data, note = self.fetch(system, "bitcoin:7", {"current_price": 1.0})
+        assert data == {"current_price": 1.0}
+
+    def test_client_errors_still_mark_section_degraded(self, system):
+        system.breakers["exa"] = CircuitBreaker("exa", failure_threshold=3)
+        unauthorized = {"error": "API returned status code 401", "status_code": 401, "retryable": False}
+
+        data, note = system._fetch_with_breaker("exa", "bitcoin", lambda: unauthorized, fallback=lambda reason: [])
+
+        assert data == []
+        assert "exa rejected the request" in note
+        assert "401" in note
+        assert system.breakers["exa"].state == CircuitBreaker.CLOSED
+
+    def test_retryable_errors_open_breaker_and_fail_fast(self, system):
+        unavailable = {"error": "API returned status code 503", "status_code": 503, "retryable": True}
+
+        for _ in range(3):
+            data, note = self.fetch(system, "bitcoin:7", unavailable)
+        assert data == {"error": "API returned status code 503"}
+        assert "no cached data available" in note
+        assert system.breakers["coingecko"].state == CircuitBreaker.OPEN
+
+        def should_not_be_called():
+            raise AssertionError("open circuit must not call the upstream")
+
+        data, note = system._fetch_with_breaker("coingecko", "bitcoin:7", should_not_be_called,
+                                                fallback=lambda reason: {"error": reason})
+        assert "circuit open" in data["error"]
+        assert "circuit open" in note
+
+    def test_exceptions_count_as_retryable(self, system):
+        def boom():
+            raise TimeoutError("read timed out")
+
+        for _ in range(3):
+            system._fetch_with_breaker("coingecko", "bitcoin:7", boom, fallback=lambda reason: {"error": reason})
+
+        assert system.breakers["coingecko"].state == CircuitBreaker.OPEN
+
+    def test_failure_falls_back_to_cached_data(self, system):
+        self.fetch(system, "bitcoin:7", {"current_price": 1.0})
+
+        data, note = self.fetch(system, "bitcoin:7", {"error": "Request failed: timeout", "retryable": True})
+
+        assert data == {"current_price": 1.0}
+        assert "using cached data" in note
+
+    def test_stale_cache_is_not_served(self, system):
+        self.fetch(system, "bitcoin:7", {"current_price": 1.0})
+        fetched_at, data = system._cache[("coingecko", "bitcoin:7")]
+        system._cache[("coingecko", "bitcoin:7")] = (fetched_at - system.CACHE_MAX_AGE - timedelta(minutes=1), data)
+
+        data, note = self.fetch(system, "bitcoin:7", {"error": "Request failed: timeout", "retryable": True})
+
+        assert data == {"error": "Request failed: timeout"}
+        assert "no cached data available" in note
+        assert ("coingecko", "bitcoin:7") not in system._cache
+
+    def test_cache_evicts_least_recently_used(self, system):
+        system.CACHE_MAX_ENTRIES = 2
+
+        self.fetch(system, "bitcoin:7", {"current_price": 1.0})
+        self.fetch(system, "ethereum:7", {"current_price": 2.0})
+        # Serving bitcoin from cache makes it the most recently used entry
+        self.fetch(system, "bitcoin:7", {"error": "Request failed: timeout", "retryable": True})
+        self.fetch(system, "solana:7", {"current_price": 3.0})
+
+        assert list(system._cache) == [("coingecko", "bitcoin:7"), ("coingecko", "solana:7")]
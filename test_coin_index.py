@@ -0,0 +1,212 @@
+import json
+import os
+
+import pytest
+
+import coin_index
+from coin_index import CoinIndex
+
+COINS = [
+    {"id": "uniswap", "symbol": "uni", "name": "Uniswap"},
+    {"id": "a-uni-clone", "symbol": "uni", "name": "A Uni Clone"},
+    {"id": "polkadot", "symbol": "dot", "name": "Polkadot"},
+    {"id": "aaa-dot", "symbol": "dot", "name": "AAA Dot"},
+    {"id": "shiba-inu", "symbol": "shib", "name": "Shiba Inu"},
+    {"id": "near", "symbol": "near", "name": "NEAR Protocol"},
+    {"id": "thena", "symbol": "the", "name": "Thena"},
+    {"id": "the-open-network", "symbol": "ton", "name": "Toncoin"},
+    {"id": "obscure-token", "symbol": "obs", "name": "Obscure Token"},
+    {"id": "story-2", "symbol": "ip", "name": "Story"},
+    {"id": "official-trump", "symbol": "trump", "name": "Official Trump"},
+    {"id": "safe", "symbol": "safe", "name": "Safe"},
+    {"id": "flow", "symbol": "flow", "name": "Flow"},
+    {"id": "render-token", "symbol": "render", "name": "Render"},
+]
+
+RANKS = {
+    "uniswap": 20, "polkadot": 15, "shiba-inu": 18, "near": 30, "thena": 50, "the-open-network": 200,
+    "story-2": 60, "official-trump": 40, "safe": 90, "flow": 95, "render-token": 150,
+}
+
+
+def make_index(tmp_path, coins=COINS, ranks=RANKS):
+    index = CoinIndex(cache_path=str(tmp_path / "coins_list.json"))
+    index._index = index._build(coins, ranks)
+    return index
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Solana", "solana"),
+    ("Dogecoin", "dogecoin"),
+    ("ETHEREUM", "ethereum"),
+    ("Shiba Inu", "shiba-inu"),
+    ("shiba-inu", "shiba-inu"),
+    ("Obscure Token", "obscure-token"),
+])
+def test_resolves_names_and_ids(tmp_path, query, expected):
+    assert make_index(tmp_path).resolve(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("SOL", "solana"),
+    ("btc", "bitcoin"),
+    ("obs", "obscure-token"),
+])
+def test_resolves_symbols(tmp_path, query, expected):
+    assert make_index(tmp_path).resolve(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("UNI", "uniswap"),
+    ("DOT", "polkadot"),
+])
+def test_shared_symbols_resolve_by_market_cap(tmp_path, query, expected):
+    assert make_index(tmp_path).resolve(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Etherium", "ethereum"),
+    ("Etherum", "ethereum"),
+    ("bitcoinn", "bitcoin"),
+    ("solama", "solana"),
+    ("Polkadott", "polkadot"),
+])
+def test_resolves_one_edit_misspellings(tmp_path, query, expected):
+    assert make_index(tmp_path).resolve(query) == expected
+
+
+@pytest.mark.parametrize("query", ["", "notacoin", "Obscure Tokem", "btx"])
+def test_unknown_queries_return_none(tmp_path, query):
+    # Misspellings only match ranked coins, and short keys never match fuzzily
+    assert make_index(tmp_path).resolve(query) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("How's BTC doing lately?", "Bitcoin"),
+    ("Give me Solana news only", "Solana"),
+    ("Is shiba inu going up?", "Shiba Inu"),
+    ("What about NEAR this week?", "NEAR Protocol"),
+    ("Show me uni price trends", "Uniswap"),
+    ("TON news please", "Toncoin"),
+    ("Show me etherium price trends", "Ethereum"),
+    ("How is TRUMP doing?", "Official Trump"),
+    ("Render price this month", "Render"),
+])
+def test_find_in_text(tmp_path, text, expected):
+    assert make_index(tmp_path).find_in_text(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "What's happening?",
+    "Show me the price",
+    "Is it near a top?",
+    "what about ton",
+    "tell me about obs",
+    "What's the story?",
+    "Is it safe to invest now?",
+    "ETF flow this week",
+    "how will tariffs render markets",
+])
+def test_find_in_text_ignores_words_and_small_lowercase_tickers(tmp_path, text):
+    assert make_index(tmp_path).find_in_text(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("What's the story with Bitcoin?", "Bitcoin"),
+    ("Did trump tariffs hit bitcoin?", "Bitcoin"),
+    ("Is it safe to buy Ethereum now?", "Ethereum"),
+    ("ETF flow into Bitcoin this week", "Bitcoin"),
+    ("Compare Uniswap and Polkadot", "Polkadot"),
+])
+def test_find_in_text_prefers_best_ranked_mention(tmp_path, text, expected):
+    assert make_index(tmp_path).find_in_text(text) == expected
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def fake_get(responses):
+    def get(url, params=None, timeout=None):
+        return responses.pop(0)
+    return get
+
+
+def test_refresh_saves_snapshot_with_ranks(tmp_path, monkeypatch):
+    monkeypatch.setattr(coin_index.requests, "get", fake_get([
+        FakeResponse(200, COINS),
+        FakeResponse(200, [{"id": "uniswap", "market_cap_rank": 20}]),
+        FakeResponse(200, []),
+    ]))
+    index = CoinIndex(cache_path=str(tmp_path / "coins_list.json"), ranked_pages=2)
+
+    assert index.refresh()
+    assert index.fetched_at is not None
+    assert index.resolve("UNI") == "uniswap"
+
+    with open(tmp_path / "coins_list.json") as f:
+        assert json.load(f)["ranks"] == {"uniswap": 20}
+
+
+def test_failed_ranking_fetch_fails_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(coin_index.requests, "get", fake_get([
+        FakeResponse(200, COINS),
+        FakeResponse(200, [{"id": "uniswap", "market_cap_rank": 20}]),
+        FakeResponse(429),
+    ]))
+    index = CoinIndex(cache_path=str(tmp_path / "coins_list.json"), ranked_pages=2)
+
+    assert not index.refresh()
+    assert index.fetched_at is None
+    assert not os.path.exists(tmp_path / "coins_list.json")
+    # Still serving the seed index
+    assert index.resolve("UNI") is None
+    assert index.resolve("btc") == "bitcoin"
+
+
+@pytest.mark.parametrize("snapshot", [
+    [],
+    "not a dict",
+    {"coins": COINS, "ranks": RANKS},
+    {"fetched_at": "yesterday", "coins": COINS, "ranks": RANKS},
+    {"fetched_at": "2026-01-01T00:00:00", "coins": {"uniswap": "uni"}, "ranks": RANKS},
+    {"fetched_at": "2026-01-01T00:00:00", "coins": COINS, "ranks": {"uniswap": "first"}},
+])
+def test_malformed_cache_falls_back_to_seed_index(tmp_path, snapshot):
+    path = tmp_path / "coins_list.json"
+    with open(path, "w") as f:
+        json.dump(snapshot, f)
+
+    index = CoinIndex(cache_path=str(path))
+
+    assert index.resolve("Solana") == "solana"
+    assert index.resolve("Uniswap") is None
+    assert index.fetched_at is None
+
+
+def test_cache_with_bad_coin_entries_skips_them(tmp_path):
+    path = tmp_path / "coins_list.json"
+    with open(path, "w") as f:
+        json.dump({
+            "fetched_at": "2026-01-01T00:00:00",
+            "coins": [None, {"id": 5}, {"id": "uniswap", "symbol": None, "name": "Uniswap"}],
+            "ranks": {"uniswap": 20},
+        }, f)
+
+    index = CoinIndex(cache_path=str(path))
+
+    assert index.resolve("Uniswap") == "uniswap"
+    assert index.fetched_at is not None
+
+
+def test_name_for(tmp_path):
+    index = make_index(tmp_path)
+
+    assert index.name_for("shiba-inu") == "Shiba Inu"
+    assert index.name_for("ripple") == "XRP"
+    assert index.name_for("not-in-index") == "Not-In-Index"